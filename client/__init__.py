@@ -0,0 +1,4 @@
+"""
+Client package for the Coin Collector multiplayer game.
+Run from the repository root with: python -m client.client
+"""
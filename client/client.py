@@ -3,20 +3,34 @@ Main Client for the Coin Collector multiplayer game.
 Handles input, game loop, and coordinates network and rendering.
 """
 
+import logging
 import pygame
-import sys
 import time
 from typing import Dict, List, Optional, Tuple
 
-import os
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 from shared.constants import (
     GAME_WIDTH, GAME_HEIGHT, PLAYER_RADIUS, PLAYER_SPEED,
-    SERVER_HOST, SERVER_PORT, GameStates
+    SERVER_HOST, SERVER_PORT, INPUT_SEND_RATE, SERVER_TIME_SMOOTHING,
+    GameStates, MessageTypes
 )
-from network import NetworkClient, GameNetworkState
-from renderer import GameRenderer
-from interpolation import InterpolatedEntity, LocalPlayerPredictor, EntityManager
+from .network import NetworkClient, GameNetworkState
+from .renderer import GameRenderer
+from .interpolation import InterpolatedEntity, LocalPlayerPredictor, EntityManager
+
+_log = logging.getLogger(__name__)
+
+# Window events after which the static parts of the game screen (drawn only
+# on a full flip) must be presented again
+_REDRAW_EVENT_TYPES = (pygame.WINDOWEXPOSED, pygame.WINDOWRESTORED, pygame.VIDEOEXPOSE)
+
+# Event types the client actually handles; everything else is dropped by SDL
+HANDLED_EVENT_TYPES = [pygame.QUIT, pygame.KEYDOWN, *_REDRAW_EVENT_TYPES]
+
+# Movement key codes, resolved once at import instead of on every frame
+_K_LEFT, _K_a = pygame.K_LEFT, pygame.K_a
+_K_RIGHT, _K_d = pygame.K_RIGHT, pygame.K_d
+_K_UP, _K_w = pygame.K_UP, pygame.K_w
+_K_DOWN, _K_s = pygame.K_DOWN, pygame.K_s
 
 
 class CoinCollectorClient:
@@ -36,8 +50,9 @@ class CoinCollectorClient:
         # Remote entities (other players)
         self.entity_manager = EntityManager()
         
-        # Coins (not interpolated, just direct from server)
-        self.coins: List[dict] = []
+        # Coin centers as integer pixels (not interpolated, just direct from
+        # server); converted once per state instead of on every frame
+        self.coin_positions: List[Tuple[int, int]] = []
         
         # Input state
         self.current_dx = 0
@@ -45,33 +60,55 @@ class CoinCollectorClient:
         self.last_dx = 0
         self.last_dy = 0
         
+        # Input send coalescing: send on change, otherwise only as a heartbeat
+        self._last_send_time = 0.0
+        self._send_interval = 1.0 / INPUT_SEND_RATE
+        
         # Game state
         self.running = True
         self.game_time = 0
+        self._local_player_score = 0
+        
+        # Smoothed (server timestamp - local monotonic time) of received states,
+        # used to render remote players in the server's time domain
+        self._server_time_offset: Optional[float] = None
         
         # Set up network callbacks
         self.network.on_disconnect = self._on_disconnect
         self.network.on_connect = self._on_connect
         
         self.disconnected = False
+        
+        # Filter the SDL queue so unhandled events (mouse motion, window
+        # events, ...) never reach Python. Keyboard state used by
+        # get_input() is still updated by the pump.
+        pygame.event.set_blocked(None)
+        pygame.event.set_allowed(HANDLED_EVENT_TYPES)
     
     def _on_connect(self) -> None:
         """Called when connected to server."""
-        print("Connected to server!")
+        _log.info("Connected to server!")
     
     def _on_disconnect(self) -> None:
         """Called when disconnected from server."""
-        print("Disconnected from server!")
+        _log.info("Disconnected from server!")
         self.disconnected = True
     
     def handle_events(self) -> None:
-        """Handle Pygame events."""
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
+        """Handle Pygame events. Pumps the SDL queue exactly once per frame."""
+        QUIT = pygame.QUIT
+        KEYDOWN = pygame.KEYDOWN
+        K_ESCAPE = pygame.K_ESCAPE
+        
+        pygame.event.pump()
+        for event in pygame.event.get(pump=False):
+            event_type = event.type
+            if event_type == QUIT:
+                self.running = False
+            elif event_type == KEYDOWN and event.key == K_ESCAPE:
                 self.running = False
-            elif event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_ESCAPE:
-                    self.running = False
+            elif event_type in _REDRAW_EVENT_TYPES:
+                self.renderer.invalidate()
     
     def get_input(self) -> Tuple[int, int]:
         """
@@ -80,59 +117,90 @@ class CoinCollectorClient:
         """
         keys = pygame.key.get_pressed()
         
-        dx = 0
-        dy = 0
-        
-        # Horizontal movement (left/right)
-        if keys[pygame.K_LEFT] or keys[pygame.K_a]:
-            dx -= 1
-        if keys[pygame.K_RIGHT] or keys[pygame.K_d]:
-            dx += 1
-        
-        # Vertical movement (up/down)
-        if keys[pygame.K_UP] or keys[pygame.K_w]:
-            dy -= 1
-        if keys[pygame.K_DOWN] or keys[pygame.K_s]:
-            dy += 1
+        # Horizontal (left/right) and vertical (up/down) movement;
+        # bool - bool yields -1, 0 or 1
+        dx = (keys[_K_RIGHT] or keys[_K_d]) - (keys[_K_LEFT] or keys[_K_a])
+        dy = (keys[_K_DOWN] or keys[_K_s]) - (keys[_K_UP] or keys[_K_w])
         
         return dx, dy
     
     def process_server_messages(self) -> None:
         """Process all available messages from the server."""
         messages = self.network.get_messages()
+        if not messages:
+            return
+        
+        states: List[dict] = []
+        latest_assign: Optional[dict] = None
         
         for message in messages:
             self.network_state.process_message(message)
             
-            # Handle state updates
-            if message.get("type") == "state":
-                self._handle_state_update(message)
-            elif message.get("type") == "assign":
-                # Set initial position for local player
-                x = message.get("x", GAME_WIDTH // 2)
-                y = message.get("y", GAME_HEIGHT // 2)
-                self.local_predictor.set_position(x, y)
+            msg_type = message.get("type")
+            if msg_type == MessageTypes.STATE:
+                states.append(message)
+            elif msg_type == MessageTypes.ASSIGN:
+                latest_assign = message
+        
+        if latest_assign is not None:
+            # Set initial position for local player
+            x = latest_assign.get("x", GAME_WIDTH // 2)
+            y = latest_assign.get("y", GAME_HEIGHT // 2)
+            self.local_predictor.set_position(x, y)
+        
+        if states:
+            self._update_server_time_offset(states[-1])
+        
+        # Handle state updates. Every state feeds remote interpolation, but
+        # only the newest one corrects the local player - an older correction
+        # would just pull the prediction backwards.
+        last_index = len(states) - 1
+        for index, state in enumerate(states):
+            self._handle_state_update(state, apply_local_correction=(index == last_index))
     
-    def _handle_state_update(self, state: dict) -> None:
-        """Handle a game state update from the server."""
-        timestamp = state.get("timestamp", time.time())
+    def _update_server_time_offset(self, state: dict) -> None:
+        """Fold the newest state's timestamp into the server clock offset."""
+        timestamp = state.get("timestamp")
+        if timestamp is None:
+            return
+        sample = timestamp - time.monotonic()
+        if self._server_time_offset is None:
+            self._server_time_offset = sample
+        else:
+            self._server_time_offset += (sample - self._server_time_offset) * SERVER_TIME_SMOOTHING
+    
+    def _handle_state_update(self, state: dict, apply_local_correction: bool = True) -> None:
+        """
+        Handle a game state update from the server.
+        Local player correction is skipped when apply_local_correction is False.
+        """
+        # Server clock; a state without one can't be placed on the remote
+        # players' interpolation timeline, so it only updates the rest
+        timestamp = state.get("timestamp")
         players = state.get("players", [])
-        self.coins = state.get("coins", [])
+        self.coin_positions = [(int(coin["x"]), int(coin["y"])) for coin in state.get("coins", [])]
         self.game_time = state.get("game_time", 0)
         
+        local_player_id = self.network_state.player_id
+        
         for player_data in players:
-            player_id = player_data.get("id")
-            x = player_data.get("x", 0)
-            y = player_data.get("y", 0)
-            score = player_data.get("score", 0)
-            color = player_data.get("color", "gray")
+            # The server always sends the full player schema (Player.to_dict)
+            try:
+                player_id = player_data["id"]
+                x = player_data["x"]
+                y = player_data["y"]
+                score = player_data["score"]
+                color = player_data["color"]
+            except (KeyError, TypeError):
+                continue  # Malformed entry - skip it
             
-            if player_id == self.network_state.player_id:
-                # This is the local player - apply server correction
-                self.local_predictor.apply_server_correction(x, y)
-                # Update score from server (authoritative)
-                self._local_player_score = score
-            else:
+            if player_id == local_player_id:
+                if apply_local_correction:
+                    # This is the local player - apply server correction
+                    self.local_predictor.apply_server_correction(x, y)
+                    # Update score from server (authoritative)
+                    self._local_player_score = score
+            elif timestamp is not None:
                 # Remote player - add to interpolation buffer
                 self.entity_manager.update_entity(
                     player_id, timestamp, x, y, score, color
@@ -143,11 +211,13 @@ class CoinCollectorClient:
         # Get input
         self.current_dx, self.current_dy = self.get_input()
         
-        # Send input to server if it changed or periodically
-        if (self.current_dx != self.last_dx or self.current_dy != self.last_dy):
+        # Send input to server if it changed, otherwise only at the heartbeat
+        # interval so unchanged frames don't generate redundant packets
+        now = time.monotonic()
+        if (self.current_dx != self.last_dx or self.current_dy != self.last_dy or
+                now - self._last_send_time >= self._send_interval):
             self.network.send_input(self.current_dx, self.current_dy, force=True)
-        else:
-            self.network.send_input(self.current_dx, self.current_dy)
+            self._last_send_time = now
         
         self.last_dx = self.current_dx
         self.last_dy = self.current_dy
@@ -167,37 +237,44 @@ class CoinCollectorClient:
             self.renderer.render_disconnected_screen()
             return
         
-        if self.network_state.game_over:
-            self.renderer.render_game_over_screen(
-                self.network_state.winner,
-                self.network_state.final_scores,
-                self.network_state.player_id or 0
+        network_state = self.network_state
+        renderer = self.renderer
+        
+        if network_state.game_over:
+            renderer.render_game_over_screen(
+                network_state.winner,
+                network_state.final_scores,
+                network_state.player_id or 0
             )
             return
         
         if not self.network.is_connected():
-            self.renderer.render_connecting_screen()
+            renderer.render_connecting_screen()
             return
         
-        if self.network_state.waiting_for_players:
-            self.renderer.render_waiting_screen()
+        if network_state.waiting_for_players:
+            renderer.render_waiting_screen()
             return
         
-        # Get interpolated positions for remote players
-        current_time = time.time()
-        remote_positions = self.entity_manager.get_interpolated_positions(current_time)
+        # Get interpolated positions for remote players. Snapshots carry
+        # server timestamps, so render in the server's time domain as seen
+        # through the received states; entities subtract their own delay.
+        offset = self._server_time_offset
+        server_time = time.monotonic() + (offset if offset is not None else 0.0)
+        remote_positions = self.entity_manager.get_interpolated_positions(server_time)
         
         # Get local player position
-        local_pos = (self.local_predictor.x, self.local_predictor.y)
+        local_predictor = self.local_predictor
+        local_pos = (local_predictor.x, local_predictor.y)
         
         # Render the game
-        self.renderer.render_game(
+        renderer.render_game(
             local_player_pos=local_pos,
-            local_player_id=self.network_state.player_id or 0,
-            local_player_color=self.network_state.player_color,
-            local_player_score=getattr(self, '_local_player_score', 0),
+            local_player_id=network_state.player_id or 0,
+            local_player_color=network_state.player_color,
+            local_player_score=self._local_player_score,
             remote_players=remote_positions,
-            coins=self.coins,
+            coin_positions=self.coin_positions,
             game_time=self.game_time
         )
     
@@ -209,26 +286,24 @@ class CoinCollectorClient:
         # Start network client in background thread
         self.network.start()
         
-        # Initialize local player score
-        self._local_player_score = 0
-        
         try:
             while self.running:
-                # Handle events
-                self.handle_events()
+                # Render
+                self.render()
                 
-                # Calculate delta time
+                # Cap framerate and calculate delta time. Input is polled
+                # after this sleep so prediction and sends use fresh keys.
                 delta_time = self.renderer.tick(60)
                 
+                # Handle events
+                self.handle_events()
+                
                 # Update game state
                 if self.network_state.game_started and not self.network_state.game_over:
                     self.update(delta_time)
                 else:
                     # Still process messages even when not playing
                     self.process_server_messages()
-                
-                # Render
-                self.render()
         
         except KeyboardInterrupt:
             print("\nShutting down...")
@@ -239,6 +314,7 @@ class CoinCollectorClient:
 
 def main():
     """Main entry point."""
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
     client = CoinCollectorClient()
     client.run()
 
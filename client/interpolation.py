@@ -5,21 +5,75 @@ smooth visual movement even with delayed/infrequent network updates.
 """
 
 import time
-from dataclasses import dataclass, field
-from typing import List, Tuple, Optional
+from array import array
+from bisect import bisect_right
+from typing import Sequence, Tuple, Optional
 
-import sys
-import os
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
-from shared.constants import INTERPOLATION_DELAY, POSITION_BUFFER_SIZE
+from shared.constants import DIRECTION_VECTORS, INTERPOLATION_DELAY, POSITION_BUFFER_SIZE
 
 
-@dataclass
-class PositionSnapshot:
-    """A single position snapshot with timestamp."""
-    timestamp: float
-    x: float
-    y: float
+def interpolate_snapshots(timestamps: Sequence[float], xs: Sequence[float],
+                          ys: Sequence[float], render_time: float) -> Tuple[float, float]:
+    """
+    Search + lerp kernel over a non-empty, time-ordered snapshot history.
+    Pure numeric function of its arguments so it can be profiled or
+    compiled independently of the entity classes.
+    """
+    # Binary search for the first snapshot newer than render time; the one
+    # before it (if any) is the other end of the interpolation segment
+    count = len(timestamps)
+    after = bisect_right(timestamps, render_time)
+    
+    if after == 0:
+        # Render time is before all snapshots - use earliest
+        return xs[0], ys[0]
+    
+    if after == count:
+        # Render time is after all snapshots - use latest
+        # This can happen if we're not receiving updates fast enough
+        return xs[-1], ys[-1]
+    
+    # Interpolate between before and after
+    before = after - 1
+    before_time = timestamps[before]
+    time_diff = timestamps[after] - before_time
+    if time_diff <= 0:
+        return xs[after], ys[after]
+    
+    # Calculate interpolation factor (0 to 1)
+    t = (render_time - before_time) / time_diff
+    t = max(0.0, min(1.0, t))  # Clamp to [0, 1]
+    
+    # Linear interpolation
+    before_x = xs[before]
+    before_y = ys[before]
+    return before_x + (xs[after] - before_x) * t, before_y + (ys[after] - before_y) * t
+
+
+def predict_position(x: float, y: float, dx: int, dy: int, speed: float,
+                     delta_time: float, game_width: float, game_height: float,
+                     player_radius: float) -> Tuple[float, float]:
+    """
+    Movement kernel for client-side prediction: normalize the input
+    direction, step by speed * delta_time and clamp to the game area.
+    """
+    if not dx and not dy:
+        return x, y
+    
+    # Normalize diagonal movement
+    normalized_dx, normalized_dy = DIRECTION_VECTORS[(dx, dy)]
+    
+    # Apply movement
+    step = speed * delta_time
+    new_x = x + normalized_dx * step
+    new_y = y + normalized_dy * step
+    
+    # Clamp to game boundaries (inline compares avoid min()/max() calls)
+    hi_x = game_width - player_radius
+    hi_y = game_height - player_radius
+    new_x = player_radius if new_x < player_radius else (hi_x if new_x > hi_x else new_x)
+    new_y = player_radius if new_y < player_radius else (hi_y if new_y > hi_y else new_y)
+    return new_x, new_y
 
 
 class InterpolatedEntity:
@@ -27,12 +81,23 @@ class InterpolatedEntity:
     Manages position interpolation for a remote entity.
     Stores a buffer of recent position snapshots and interpolates
     between them to create smooth rendering.
+    
+    Snapshots are kept as parallel timestamp/x/y columns of unboxed doubles
+    rather than one object per snapshot, so the render-time search only
+    touches timestamps and adding a snapshot allocates nothing.
     """
     
+    __slots__ = (
+        'max_buffer_size', 'timestamps', 'xs', 'ys', 'render_delay',
+        'current_x', 'current_y', 'score', 'color', 'entity_id',
+    )
+    
     def __init__(self, render_delay: float = INTERPOLATION_DELAY):
-        self.position_buffer: List[PositionSnapshot] = []
-        self.render_delay = render_delay  # Render behind the latest data for interpolation room
         self.max_buffer_size = POSITION_BUFFER_SIZE
+        self.timestamps: array = array('d')
+        self.xs: array = array('d')
+        self.ys: array = array('d')
+        self.render_delay = render_delay  # Render behind the latest data for interpolation room
         
         # Current interpolated position
         self.current_x: float = 0.0
@@ -48,76 +113,45 @@ class InterpolatedEntity:
         Add a new position snapshot to the buffer.
         Maintains chronological order and limits buffer size.
         """
-        snapshot = PositionSnapshot(timestamp, x, y)
+        timestamps = self.timestamps
+        xs = self.xs
+        ys = self.ys
         
         # Insert in chronological order (usually at the end)
-        if not self.position_buffer or timestamp >= self.position_buffer[-1].timestamp:
-            self.position_buffer.append(snapshot)
+        if not timestamps or timestamp >= timestamps[-1]:
+            timestamps.append(timestamp)
+            xs.append(x)
+            ys.append(y)
         else:
             # Find correct insertion point (rare case of out-of-order packets)
-            for i, existing in enumerate(self.position_buffer):
-                if timestamp < existing.timestamp:
-                    self.position_buffer.insert(i, snapshot)
-                    break
+            i = bisect_right(timestamps, timestamp)
+            if i == 0 and len(timestamps) >= self.max_buffer_size:
+                return  # Older than everything we keep
+            timestamps.insert(i, timestamp)
+            xs.insert(i, x)
+            ys.insert(i, y)
         
-        # Limit buffer size by removing oldest snapshots
-        while len(self.position_buffer) > self.max_buffer_size:
-            self.position_buffer.pop(0)
+        # Limit buffer size by removing the oldest snapshot
+        if len(timestamps) > self.max_buffer_size:
+            del timestamps[0]
+            del xs[0]
+            del ys[0]
     
     def get_interpolated_position(self, current_time: float) -> Tuple[float, float]:
         """
         Get the interpolated position for rendering.
         Returns (x, y) tuple.
         """
-        if not self.position_buffer:
+        timestamps = self.timestamps
+        if not timestamps:
             return self.current_x, self.current_y
         
         # Calculate render time (behind the latest data to allow interpolation)
         render_time = current_time - self.render_delay
         
-        # Find two snapshots to interpolate between
-        before: Optional[PositionSnapshot] = None
-        after: Optional[PositionSnapshot] = None
-        
-        for i, snapshot in enumerate(self.position_buffer):
-            if snapshot.timestamp <= render_time:
-                before = snapshot
-            else:
-                after = snapshot
-                break
-        
-        # Handle edge cases
-        if before is None and after is None:
-            # No snapshots at all - shouldn't happen if buffer is populated
-            return self.current_x, self.current_y
-        
-        if before is None:
-            # Render time is before all snapshots - use earliest
-            self.current_x = self.position_buffer[0].x
-            self.current_y = self.position_buffer[0].y
-            return self.current_x, self.current_y
-        
-        if after is None:
-            # Render time is after all snapshots - use latest
-            # This can happen if we're not receiving updates fast enough
-            self.current_x = before.x
-            self.current_y = before.y
-            return self.current_x, self.current_y
-        
-        # Interpolate between before and after
-        time_diff = after.timestamp - before.timestamp
-        if time_diff <= 0:
-            self.current_x = after.x
-            self.current_y = after.y
-        else:
-            # Calculate interpolation factor (0 to 1)
-            t = (render_time - before.timestamp) / time_diff
-            t = max(0.0, min(1.0, t))  # Clamp to [0, 1]
-            
-            # Linear interpolation
-            self.current_x = before.x + (after.x - before.x) * t
-            self.current_y = before.y + (after.y - before.y) * t
-        
+        self.current_x, self.current_y = interpolate_snapshots(
+            timestamps, self.xs, self.ys, render_time
+        )
         return self.current_x, self.current_y
     
     def set_immediate_position(self, x: float, y: float) -> None:
@@ -127,7 +161,9 @@ class InterpolatedEntity:
     
     def clear_buffer(self) -> None:
         """Clear the position buffer."""
-        self.position_buffer.clear()
+        del self.timestamps[:]
+        del self.xs[:]
+        del self.ys[:]
 
 
 class LocalPlayerPredictor:
@@ -136,6 +172,12 @@ class LocalPlayerPredictor:
     Provides responsive controls while still respecting server authority.
     """
     
+    __slots__ = (
+        'player_speed', 'x', 'y', 'server_x', 'server_y', 'dx', 'dy',
+        'max_allowed_drift', 'snap_threshold', 'reconciliation_factor',
+        '_snap_threshold_sq', '_max_allowed_drift_sq',
+    )
+    
     def __init__(self, player_speed: float):
         self.player_speed = player_speed
         
@@ -157,6 +199,9 @@ class LocalPlayerPredictor:
         self.max_allowed_drift: float = 100.0  # Allow more drift before correcting
         self.snap_threshold: float = 150.0     # Snap if beyond this
         self.reconciliation_factor: float = 0.05  # Slower correction (was 0.1)
+        # Squared thresholds so the common in-range check needs no sqrt
+        self._snap_threshold_sq: float = self.snap_threshold ** 2
+        self._max_allowed_drift_sq: float = self.max_allowed_drift ** 2
     
     def set_input(self, dx: int, dy: int) -> None:
         """Set current input direction."""
@@ -169,22 +214,13 @@ class LocalPlayerPredictor:
         Update predicted position based on input.
         Returns (x, y) of predicted position.
         """
-        import math
-        
-        if self.dx != 0 or self.dy != 0:
-            # Normalize diagonal movement
-            magnitude = math.sqrt(self.dx ** 2 + self.dy ** 2)
-            normalized_dx = self.dx / magnitude
-            normalized_dy = self.dy / magnitude
-            
-            # Apply movement
-            new_x = self.x + normalized_dx * self.player_speed * delta_time
-            new_y = self.y + normalized_dy * self.player_speed * delta_time
-            
-            # Clamp to game boundaries
-            self.x = max(player_radius, min(game_width - player_radius, new_x))
-            self.y = max(player_radius, min(game_height - player_radius, new_y))
-        
+        dx = self.dx
+        dy = self.dy
+        if dx or dy:
+            self.x, self.y = predict_position(
+                self.x, self.y, dx, dy, self.player_speed,
+                delta_time, game_width, game_height, player_radius
+            )
         return self.x, self.y
     
     def apply_server_correction(self, server_x: float, server_y: float) -> None:
@@ -202,15 +238,16 @@ class LocalPlayerPredictor:
         # Calculate distance from server position
         dx = server_x - self.x
         dy = server_y - self.y
-        distance = (dx ** 2 + dy ** 2) ** 0.5
+        distance_sq = dx * dx + dy * dy
         
-        if distance > self.snap_threshold:
+        if distance_sq > self._snap_threshold_sq:
             # Very large discrepancy - snap immediately (possible teleport/desync)
             self.x = server_x
             self.y = server_y
-        elif distance > self.max_allowed_drift:
+        elif distance_sq > self._max_allowed_drift_sq:
             # Moderate discrepancy - slowly correct toward server
             # Only correct the excess beyond allowed drift
+            distance = distance_sq ** 0.5
             correction_strength = (distance - self.max_allowed_drift) / distance
             self.x += dx * correction_strength * self.reconciliation_factor
             self.y += dy * correction_strength * self.reconciliation_factor
@@ -231,6 +268,10 @@ class EntityManager:
     
     def __init__(self):
         self.entities: dict[int, InterpolatedEntity] = {}
+        # Render data reused across frames, updated in place each frame
+        self._positions_cache: dict[int, dict] = {}
+        # Time the cache was last computed for; None when entities changed since
+        self._cache_time: Optional[float] = None
     
     def get_or_create_entity(self, entity_id: int) -> InterpolatedEntity:
         """Get an existing entity or create a new one."""
@@ -247,21 +288,36 @@ class EntityManager:
         entity.add_snapshot(timestamp, x, y)
         entity.score = score
         entity.color = color
+        self._cache_time = None
     
     def remove_entity(self, entity_id: int) -> None:
         """Remove an entity."""
         if entity_id in self.entities:
             del self.entities[entity_id]
+        self._positions_cache.pop(entity_id, None)
+        self._cache_time = None
     
     def get_interpolated_positions(self, current_time: float) -> dict:
-        """Get all interpolated positions for rendering."""
-        positions = {}
+        """
+        Get all interpolated positions for rendering.
+        
+        The returned dict and its per-entity dicts are reused and overwritten
+        on the next call; callers must not hold on to them across frames.
+        Repeated calls with the same time (multi-pass rendering) reuse the
+        previous result until an entity is updated or removed.
+        """
+        cache = self._positions_cache
+        if current_time == self._cache_time:
+            return cache
+        
         for entity_id, entity in self.entities.items():
             x, y = entity.get_interpolated_position(current_time)
-            positions[entity_id] = {
-                'x': x,
-                'y': y,
-                'score': entity.score,
-                'color': entity.color
-            }
-        return positions
+            data = cache.get(entity_id)
+            if data is None:
+                data = cache[entity_id] = {}
+            data['x'] = x
+            data['y'] = y
+            data['score'] = entity.score
+            data['color'] = entity.color
+        self._cache_time = current_time
+        return cache
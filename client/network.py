@@ -8,15 +8,11 @@ import json
 import time
 import threading
 from collections import deque
-from dataclasses import dataclass
-from typing import Callable, Optional, Dict, Any
-from queue import Queue, Empty
+from typing import Callable, Optional, Dict, Any, List, Tuple
 
-import sys
-import os
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 from shared.constants import (
-    SERVER_HOST, SERVER_PORT, NETWORK_DELAY_MS, INPUT_SEND_RATE
+    SERVER_HOST, SERVER_PORT, NETWORK_DELAY_MS, INPUT_SEND_RATE,
+    GameStates, MessageTypes
 )
 
 # Websockets import - will be available after installing dependencies
@@ -27,44 +23,67 @@ except ImportError:
     websockets = None
     WebSocketClientProtocol = None
 
+# Optional faster JSON codec; falls back to the standard library.
+try:
+    import orjson
+    _loads = orjson.loads
+    
+    def _dumps(obj: Any) -> str:
+        return orjson.dumps(obj).decode()
+except ImportError:
+    orjson = None
+    _loads = json.loads
+    _dumps = json.dumps
 
-@dataclass
-class DelayedMessage:
-    """A message that will be delivered after a delay."""
-    delivery_time: float
-    message: dict
+# Local timing (delay queue, input throttle) uses the monotonic clock so
+# wall-clock adjustments can't stall or flush delayed messages
+_monotonic = time.monotonic
+
+# Upper bound on messages kept in the delay queue. If the game thread stalls,
+# the oldest (already stale) messages are dropped when it next drains the
+# queue instead of all being delivered in one burst.
+MAX_DELAYED_MESSAGES = 256
 
 
 class DelayedMessageQueue:
     """
     Queue for simulating network latency on incoming messages.
     Messages are held for NETWORK_DELAY_MS before being made available.
+    Entries are stored as plain (delivery_time, message) tuples.
+    At most max_size entries are kept; the oldest are dropped first.
     """
     
-    def __init__(self, delay_ms: int = NETWORK_DELAY_MS):
+    def __init__(self, delay_ms: int = NETWORK_DELAY_MS,
+                 max_size: int = MAX_DELAYED_MESSAGES):
         self.delay = delay_ms / 1000.0
+        self.max_size = max_size
+        # Only the network thread appends and only the game thread pops;
+        # deque append/[0]/popleft are atomic, so no lock is needed. The size
+        # cap is enforced by the consumer rather than deque(maxlen=...): an
+        # evicting append could remove the head between the consumer's [0]
+        # check and its popleft().
         self.queue: deque = deque()
-        self.lock = threading.Lock()
     
     def add_message(self, message: dict) -> None:
         """Add a message to the delay queue."""
-        delivery_time = time.time() + self.delay
-        with self.lock:
-            self.queue.append(DelayedMessage(delivery_time, message))
+        delivery_time = _monotonic() + self.delay
+        self.queue.append((delivery_time, message))
     
     def get_ready_messages(self) -> list:
         """Get all messages that are ready to be delivered."""
         ready = []
-        current_time = time.time()
-        with self.lock:
-            while self.queue and self.queue[0].delivery_time <= current_time:
-                ready.append(self.queue.popleft().message)
+        current_time = _monotonic()
+        queue = self.queue
+        # Drop the oldest (stale) messages if the game thread fell behind
+        while len(queue) > self.max_size:
+            queue.popleft()
+        while queue and queue[0][0] <= current_time:
+            ready.append(queue.popleft()[1])
         return ready
     
     def clear(self) -> None:
         """Clear all pending messages."""
-        with self.lock:
-            self.queue.clear()
+        self.queue.clear()
 
 
 class NetworkClient:
@@ -84,17 +103,24 @@ class NetworkClient:
         
         # Message queues
         self.incoming_queue = DelayedMessageQueue()
-        self.outgoing_queue: Queue = Queue()
+        # Single producer (game thread) / single consumer (network thread);
+        # deque append/popleft are atomic, so no Queue locking is needed.
+        # Holds already-serialized JSON payloads.
+        self.outgoing_queue: deque = deque()
         
         # Threading
         self.thread: Optional[threading.Thread] = None
         self.loop: Optional[asyncio.AbstractEventLoop] = None
         self.running = False
         self._stop_event: Optional[asyncio.Event] = None
+        self._outgoing_event: Optional[asyncio.Event] = None  # Set when outgoing_queue gains data
+        self._tasks: List[asyncio.Task] = []  # Receive/send/stop tasks of the connection
         
         # Input throttling
-        self.last_input_send_time = 0
+        self._next_send_time = 0.0  # Earliest time an unforced input may be sent
         self.input_send_interval = 1.0 / INPUT_SEND_RATE
+        # Serialized input payloads by (dx, dy); at most 9 movement directions
+        self._input_cache: Dict[Tuple[int, int], str] = {}
         
         # Callbacks
         self.on_disconnect: Optional[Callable] = None
@@ -145,7 +171,12 @@ class NetworkClient:
         """Thread entry point - runs the asyncio event loop."""
         self.loop = asyncio.new_event_loop()
         asyncio.set_event_loop(self.loop)
+        # Run each task's first step immediately instead of scheduling it
+        # (Python 3.12+; older runtimes keep the default factory)
+        if hasattr(asyncio, 'eager_task_factory'):
+            self.loop.set_task_factory(asyncio.eager_task_factory)
         self._stop_event = asyncio.Event()
+        self._outgoing_event = asyncio.Event()
         
         try:
             self.loop.run_until_complete(self._connect_and_run())
@@ -153,16 +184,11 @@ class NetworkClient:
             if self.running:  # Only print error if we didn't intentionally stop
                 print(f"Network thread error: {e}")
         finally:
-            # Cancel all pending tasks
+            # Cancel only the tasks we started (normally already done by
+            # _connect_and_run); library-owned tasks are left to the
+            # websocket's own shutdown
             try:
-                pending = asyncio.all_tasks(self.loop)
-                for task in pending:
-                    task.cancel()
-                # Give tasks a chance to clean up
-                if pending:
-                    self.loop.run_until_complete(
-                        asyncio.gather(*pending, return_exceptions=True)
-                    )
+                self.loop.run_until_complete(self._cancel_tasks())
             except Exception:
                 pass
             
@@ -183,7 +209,9 @@ class NetworkClient:
             async with websockets.connect(
                 self.uri,
                 ping_interval=20,
-                ping_timeout=20
+                ping_timeout=20,
+                compression=None,  # Messages are tiny; deflate only costs CPU
+                max_size=1 << 20   # Cap inbound messages at 1 MiB
             ) as websocket:
                 self.websocket = websocket
                 self.connected = True
@@ -193,14 +221,19 @@ class NetworkClient:
                     self.on_connect()
                 
                 # Run send and receive tasks concurrently with stop event
+                self._tasks = [asyncio.ensure_future(coro) for coro in (
+                    self._receive_messages(),
+                    self._send_messages(),
+                    self._wait_for_stop()
+                )]
                 try:
-                    await asyncio.gather(
-                        self._receive_messages(),
-                        self._send_messages(),
-                        self._wait_for_stop()
-                    )
+                    await asyncio.gather(*self._tasks)
                 except asyncio.CancelledError:
                     pass  # Expected when stopping
+                finally:
+                    # gather doesn't cancel the other children when one
+                    # finishes with an error or CancelledError
+                    await self._cancel_tasks()
         except ConnectionRefusedError:
             print(f"Could not connect to server at {self.uri}")
             print("Make sure the server is running!")
@@ -215,6 +248,14 @@ class NetworkClient:
             if self.on_disconnect and self.running:
                 self.on_disconnect()
     
+    async def _cancel_tasks(self) -> None:
+        """Cancel the connection's tasks and wait for them to finish."""
+        tasks, self._tasks = self._tasks, []
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+    
     async def _wait_for_stop(self) -> None:
         """Wait for the stop signal."""
         if self._stop_event:
@@ -222,17 +263,16 @@ class NetworkClient:
             raise asyncio.CancelledError()
     
     async def _receive_messages(self) -> None:
-        """Receive messages from server and add to delayed queue."""
+        """
+        Receive messages from server and add to delayed queue.
+        Malformed JSON from the server is a server bug: the decode error
+        propagates and ends the connection instead of being skipped.
+        """
         try:
+            # Stopping cancels this task, so no per-message running check
             async for message in self.websocket:
-                if not self.running:
-                    break
-                try:
-                    data = json.loads(message)
-                    # Add to delayed queue to simulate latency
-                    self.incoming_queue.add_message(data)
-                except json.JSONDecodeError:
-                    print("Received invalid JSON from server")
+                # Add to delayed queue to simulate latency
+                self.incoming_queue.add_message(_loads(message))
         except asyncio.CancelledError:
             pass  # Expected when stopping
         except websockets.exceptions.ConnectionClosed:
@@ -240,40 +280,56 @@ class NetworkClient:
                 print("Server connection closed")
     
     async def _send_messages(self) -> None:
-        """Send queued messages to server."""
+        """
+        Send queued messages to server.
+        Runs until the connection closes or the task is cancelled on stop.
+        """
+        # The websocket is set before the send/receive tasks start
+        websocket = self.websocket
+        outgoing = self.outgoing_queue
+        outgoing_event = self._outgoing_event
         try:
-            while self.running and self.connected:
-                try:
-                    # Check for messages to send
-                    try:
-                        message = self.outgoing_queue.get_nowait()
-                        if self.websocket:
-                            await self.websocket.send(json.dumps(message))
-                    except Empty:
-                        pass
-                    
-                    await asyncio.sleep(0.01)  # Small delay to prevent busy loop
-                except websockets.exceptions.ConnectionClosed:
-                    break
+            while True:
+                # Drain everything queued since the last wakeup
+                while outgoing:
+                    await websocket.send(outgoing.popleft())
+                
+                # Sleep until send_input() signals new data
+                outgoing_event.clear()
+                if not outgoing:
+                    await outgoing_event.wait()
         except asyncio.CancelledError:
             pass  # Expected when stopping
+        except websockets.exceptions.ConnectionClosed:
+            pass  # Receive loop reports the closed connection
     
     def send_input(self, dx: int, dy: int, force: bool = False) -> None:
         """
         Send player input to server.
         Throttled to INPUT_SEND_RATE per second unless force=True.
         """
-        current_time = time.time()
+        current_time = _monotonic()
         
-        if not force and current_time - self.last_input_send_time < self.input_send_interval:
+        if not force and current_time < self._next_send_time:
             return
         
-        self.last_input_send_time = current_time
-        self.outgoing_queue.put({
-            "type": "input",
-            "dx": dx,
-            "dy": dy
-        })
+        self._next_send_time = current_time + self.input_send_interval
+        
+        # Serialize here on the game thread so the send loop only ships text;
+        # each direction is encoded once and reused afterwards
+        key = (dx, dy)
+        payload = self._input_cache.get(key)
+        if payload is None:
+            payload = _dumps({"type": MessageTypes.INPUT, "dx": dx, "dy": dy})
+            self._input_cache[key] = payload
+        self.outgoing_queue.append(payload)
+        
+        # Wake the send loop; asyncio.Event must be set from its own loop
+        if self.loop and self._outgoing_event:
+            try:
+                self.loop.call_soon_threadsafe(self._outgoing_event.set)
+            except RuntimeError:
+                pass  # Loop might already be closed
     
     def get_messages(self) -> list:
         """Get all messages that have passed their delay time."""
@@ -301,47 +357,72 @@ class GameNetworkState:
         
         # Latest state from server
         self.last_server_state: Optional[dict] = None
+        # In the server's clock domain (its time.monotonic()), which is not
+        # comparable with any local clock
         self.last_state_timestamp: float = 0
+        
+        # Message type -> handler; one dict lookup per incoming message
+        self._handlers: Dict[int, Callable[[dict], None]] = {
+            MessageTypes.ASSIGN: self._handle_assign,
+            MessageTypes.WAITING: self._handle_waiting,
+            MessageTypes.GAME_START: self._handle_game_start,
+            MessageTypes.STATE: self._handle_state,
+            MessageTypes.COIN_COLLECTED: self._handle_coin_collected,
+            MessageTypes.GAME_OVER: self._handle_game_over,
+            MessageTypes.PLAYER_DISCONNECTED: self._handle_player_disconnected,
+            MessageTypes.ERROR: self._handle_error,
+        }
     
     def process_message(self, message: dict) -> None:
         """Process a message from the server."""
-        msg_type = message.get("type")
-        
-        if msg_type == "assign":
-            self.player_id = message.get("player_id")
-            self.player_color = message.get("color", "gray")
-            print(f"Assigned as Player {self.player_id} ({self.player_color})")
-        
-        elif msg_type == "waiting":
-            self.waiting_for_players = True
-            print(message.get("message", "Waiting..."))
-        
-        elif msg_type == "game_start":
+        handler = self._handlers.get(message.get("type"))
+        if handler is not None:
+            handler(message)
+    
+    def _handle_assign(self, message: dict) -> None:
+        """Store our player assignment."""
+        self.player_id = message.get("player_id")
+        self.player_color = message.get("color", "gray")
+        print(f"Assigned as Player {self.player_id} ({self.player_color})")
+    
+    def _handle_waiting(self, message: dict) -> None:
+        """Mark that we are waiting for more players."""
+        self.waiting_for_players = True
+        print(message.get("message", "Waiting..."))
+    
+    def _handle_game_start(self, message: dict) -> None:
+        """Mark the game as started."""
+        self.waiting_for_players = False
+        self.game_started = True
+        print("Game started!")
+    
+    def _handle_state(self, message: dict) -> None:
+        """Record the latest state snapshot."""
+        self.last_server_state = message
+        # No local clock can stand in for a missing server timestamp
+        self.last_state_timestamp = message.get("timestamp", self.last_state_timestamp)
+        if message.get("game_state") == GameStates.PLAYING:
             self.waiting_for_players = False
             self.game_started = True
-            print("Game started!")
-        
-        elif msg_type == "state":
-            self.last_server_state = message
-            self.last_state_timestamp = message.get("timestamp", time.time())
-            if message.get("game_state") == "playing":
-                self.waiting_for_players = False
-                self.game_started = True
-        
-        elif msg_type == "coin_collected":
-            player_id = message.get("player_id")
-            new_score = message.get("new_score")
-            print(f"Player {player_id} collected a coin! Score: {new_score}")
-        
-        elif msg_type == "game_over":
-            self.game_over = True
-            self.winner = message.get("winner")
-            self.final_scores = message.get("final_scores", {})
-            print(f"Game Over! Winner: Player {self.winner}")
-        
-        elif msg_type == "player_disconnected":
-            player_id = message.get("player_id")
-            print(f"Player {player_id} disconnected")
-        
-        elif msg_type == "error":
-            print(f"Server error: {message.get('message')}")
+    
+    def _handle_coin_collected(self, message: dict) -> None:
+        """Report a coin pickup."""
+        player_id = message.get("player_id")
+        new_score = message.get("new_score")
+        print(f"Player {player_id} collected a coin! Score: {new_score}")
+    
+    def _handle_game_over(self, message: dict) -> None:
+        """Record the game result."""
+        self.game_over = True
+        self.winner = message.get("winner")
+        self.final_scores = message.get("final_scores", {})
+        print(f"Game Over! Winner: Player {self.winner}")
+    
+    def _handle_player_disconnected(self, message: dict) -> None:
+        """Report another player leaving."""
+        player_id = message.get("player_id")
+        print(f"Player {player_id} disconnected")
+    
+    def _handle_error(self, message: dict) -> None:
+        """Report a server error."""
+        print(f"Server error: {message.get('message')}")
@@ -6,9 +6,6 @@ Handles all visual rendering of the game state.
 import pygame
 from typing import Dict, List, Optional, Tuple
 
-import sys
-import os
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 from shared.constants import (
     GAME_WIDTH, GAME_HEIGHT, PLAYER_RADIUS, COIN_RADIUS,
     PLAYER_COLORS, COIN_COLOR, BACKGROUND_COLOR, TEXT_COLOR,
@@ -16,6 +13,13 @@ from shared.constants import (
 )
 
 
+# Upper bound on cached text surfaces before the cache is reset
+TEXT_CACHE_SIZE = 256
+
+# Fallback for unknown player color names
+DEFAULT_PLAYER_COLOR = (150, 150, 150)
+
+
 class GameRenderer:
     """
     Handles all Pygame rendering for the game.
@@ -35,6 +39,50 @@ class GameRenderer:
         self.font_medium = pygame.font.Font(None, 36)
         self.font_small = pygame.font.Font(None, 24)
         
+        # Rendered text surfaces keyed by (font, text, color); see _text()
+        self._text_cache: Dict[tuple, pygame.Surface] = {}
+        
+        # Static text, rendered and positioned once as (surface, rect) pairs
+        center_x = GAME_WIDTH // 2
+        self._title_text = self._static_text(
+            self.font_large, "Coin Collector", TEXT_COLOR, center=(center_x, GAME_HEIGHT // 3))
+        self._waiting_text = self._static_text(
+            self.font_medium, "Waiting for players...", WAITING_TEXT_COLOR,
+            center=(center_x, GAME_HEIGHT // 2))
+        self._need_players_text = self._static_text(
+            self.font_small, "Need 2 players to start", WAITING_TEXT_COLOR,
+            center=(center_x, GAME_HEIGHT // 2 + 40))
+        self._connecting_text = self._static_text(
+            self.font_medium, "Connecting to server...", WAITING_TEXT_COLOR,
+            center=(center_x, GAME_HEIGHT // 2))
+        self._disconnected_text = self._static_text(
+            self.font_large, "Disconnected from Server", (255, 100, 100),
+            center=(center_x, GAME_HEIGHT // 2))
+        self._disconnected_esc_text = self._static_text(
+            self.font_small, "Press ESC to exit", WAITING_TEXT_COLOR,
+            center=(center_x, GAME_HEIGHT // 2 + 50))
+        self._game_over_text = self._static_text(
+            self.font_large, "Game Over!", TEXT_COLOR, center=(center_x, GAME_HEIGHT // 4))
+        self._game_over_esc_text = self._static_text(
+            self.font_small, "Press ESC to exit", WAITING_TEXT_COLOR,
+            center=(center_x, GAME_HEIGHT - 50))
+        self._controls_text = self._static_text(
+            self.font_small, "WASD or Arrow Keys to move", WAITING_TEXT_COLOR,
+            center=(center_x, GAME_HEIGHT - 20))
+        self._scores_title_text = self._static_text(
+            self.font_small, "SCORES", TEXT_COLOR, topleft=(20, 15))
+        # Positioned per frame above the local player
+        self._you_surface = self.font_small.render("YOU", True, TEXT_COLOR)
+        
+        # Pre-rendered sprites: one coin (shine baked in) and one player
+        # circle per (fill, outline, outline width); see _player_sprite()
+        self._coin_sprite = self._make_coin_sprite()
+        self._player_sprites: Dict[tuple, pygame.Surface] = {}
+        
+        # Regions of dynamic game elements presented last frame; None forces
+        # a full flip (first game frame, or after another screen was shown)
+        self._last_dirty_rects: Optional[List[pygame.Rect]] = None
+        
         # Clock for framerate
         self.clock = pygame.time.Clock()
         
@@ -44,65 +92,108 @@ class GameRenderer:
             "red": (255, 50, 50),
             "green": (50, 255, 50),
             "yellow": (255, 255, 50),
-            "gray": (150, 150, 150)
+            "gray": DEFAULT_PLAYER_COLOR
         }
     
+    def _text(self, font: pygame.font.Font, text: str,
+              color: Tuple[int, int, int]) -> pygame.Surface:
+        """
+        Render antialiased text, reusing the surface from a previous frame
+        when the same font, string and color were rendered before.
+        """
+        key = (id(font), text, color)
+        surface = self._text_cache.get(key)
+        if surface is None:
+            # Scores and timer strings keep changing; keep the cache bounded
+            if len(self._text_cache) >= TEXT_CACHE_SIZE:
+                self._text_cache.clear()
+            surface = font.render(text, True, color)
+            self._text_cache[key] = surface
+        return surface
+    
+    @staticmethod
+    def _static_text(font: pygame.font.Font, text: str, color: Tuple[int, int, int],
+                     **position: Tuple[int, int]) -> Tuple[pygame.Surface, pygame.Rect]:
+        """Render text once and place it; position is a get_rect() keyword."""
+        surface = font.render(text, True, color)
+        return surface, surface.get_rect(**position)
+    
+    def _make_coin_sprite(self) -> pygame.Surface:
+        """Pre-render a coin, including its shine, on a transparent surface."""
+        sprite = pygame.Surface((COIN_RADIUS * 2, COIN_RADIUS * 2), pygame.SRCALPHA)
+        pygame.draw.circle(sprite, COIN_COLOR, (COIN_RADIUS, COIN_RADIUS), COIN_RADIUS)
+        # Add a slight shine effect
+        pygame.draw.circle(sprite, (255, 240, 150),
+                           (COIN_RADIUS - 3, COIN_RADIUS - 3), COIN_RADIUS // 3)
+        return sprite.convert_alpha()
+    
+    def _player_sprite(self, color: Tuple[int, int, int],
+                       outline_color: Tuple[int, int, int],
+                       outline_width: int) -> pygame.Surface:
+        """Get (pre-rendering on first use) a filled, outlined player circle."""
+        key = (color, outline_color, outline_width)
+        sprite = self._player_sprites.get(key)
+        if sprite is None:
+            size = PLAYER_RADIUS * 2
+            sprite = pygame.Surface((size, size), pygame.SRCALPHA)
+            center = (PLAYER_RADIUS, PLAYER_RADIUS)
+            pygame.draw.circle(sprite, color, center, PLAYER_RADIUS)
+            pygame.draw.circle(sprite, outline_color, center, PLAYER_RADIUS, outline_width)
+            sprite = sprite.convert_alpha()
+            self._player_sprites[key] = sprite
+        return sprite
+    
+    def invalidate(self) -> None:
+        """Make the next game frame present the whole screen, not just dirty rects."""
+        self._last_dirty_rects = None
+    
+    def _flip(self) -> None:
+        """Present the whole screen and reset dirty-rect tracking."""
+        self._last_dirty_rects = None
+        pygame.display.flip()
+    
     def get_color(self, color_name: str) -> Tuple[int, int, int]:
         """Convert color name to RGB tuple."""
-        return self.color_map.get(color_name, (150, 150, 150))
+        return self.color_map.get(color_name, DEFAULT_PLAYER_COLOR)
     
     def render_waiting_screen(self) -> None:
         """Render the waiting for players screen."""
         self.screen.fill(BACKGROUND_COLOR)
         
         # Title
-        title = self.font_large.render("Coin Collector", True, TEXT_COLOR)
-        title_rect = title.get_rect(center=(GAME_WIDTH // 2, GAME_HEIGHT // 3))
-        self.screen.blit(title, title_rect)
+        self.screen.blit(*self._title_text)
         
         # Waiting message
-        waiting_text = self.font_medium.render("Waiting for players...", True, WAITING_TEXT_COLOR)
-        waiting_rect = waiting_text.get_rect(center=(GAME_WIDTH // 2, GAME_HEIGHT // 2))
-        self.screen.blit(waiting_text, waiting_rect)
+        self.screen.blit(*self._waiting_text)
         
         # Instructions
-        instructions = self.font_small.render("Need 2 players to start", True, WAITING_TEXT_COLOR)
-        inst_rect = instructions.get_rect(center=(GAME_WIDTH // 2, GAME_HEIGHT // 2 + 40))
-        self.screen.blit(instructions, inst_rect)
+        self.screen.blit(*self._need_players_text)
         
-        pygame.display.flip()
+        self._flip()
     
     def render_connecting_screen(self) -> None:
         """Render the connecting to server screen."""
         self.screen.fill(BACKGROUND_COLOR)
         
         # Title
-        title = self.font_large.render("Coin Collector", True, TEXT_COLOR)
-        title_rect = title.get_rect(center=(GAME_WIDTH // 2, GAME_HEIGHT // 3))
-        self.screen.blit(title, title_rect)
+        self.screen.blit(*self._title_text)
         
         # Connecting message
-        connecting_text = self.font_medium.render("Connecting to server...", True, WAITING_TEXT_COLOR)
-        connecting_rect = connecting_text.get_rect(center=(GAME_WIDTH // 2, GAME_HEIGHT // 2))
-        self.screen.blit(connecting_text, connecting_rect)
+        self.screen.blit(*self._connecting_text)
         
-        pygame.display.flip()
+        self._flip()
     
     def render_disconnected_screen(self) -> None:
         """Render the disconnected screen."""
         self.screen.fill(BACKGROUND_COLOR)
         
         # Error message
-        error_text = self.font_large.render("Disconnected from Server", True, (255, 100, 100))
-        error_rect = error_text.get_rect(center=(GAME_WIDTH // 2, GAME_HEIGHT // 2))
-        self.screen.blit(error_text, error_rect)
+        self.screen.blit(*self._disconnected_text)
         
         # Instructions
-        instructions = self.font_small.render("Press ESC to exit", True, WAITING_TEXT_COLOR)
-        inst_rect = instructions.get_rect(center=(GAME_WIDTH // 2, GAME_HEIGHT // 2 + 50))
-        self.screen.blit(instructions, inst_rect)
+        self.screen.blit(*self._disconnected_esc_text)
         
-        pygame.display.flip()
+        self._flip()
     
     def render_game_over_screen(self, winner: Optional[int], scores: Dict[int, int],
                                  local_player_id: int) -> None:
@@ -110,9 +201,7 @@ class GameRenderer:
         self.screen.fill(BACKGROUND_COLOR)
         
         # Game Over title
-        title = self.font_large.render("Game Over!", True, TEXT_COLOR)
-        title_rect = title.get_rect(center=(GAME_WIDTH // 2, GAME_HEIGHT // 4))
-        self.screen.blit(title, title_rect)
+        self.screen.blit(*self._game_over_text)
         
         # Winner announcement
         if winner:
@@ -123,7 +212,7 @@ class GameRenderer:
                 winner_text = f"Player {winner} Wins!"
                 winner_color = (255, 100, 100)  # Red
             
-            winner_surface = self.font_large.render(winner_text, True, winner_color)
+            winner_surface = self._text(self.font_large, winner_text, winner_color)
             winner_rect = winner_surface.get_rect(center=(GAME_WIDTH // 2, GAME_HEIGHT // 2 - 30))
             self.screen.blit(winner_surface, winner_rect)
         
@@ -133,21 +222,19 @@ class GameRenderer:
             label = f"Player {player_id}: {score} points"
             if player_id == local_player_id:
                 label += " (You)"
-            score_surface = self.font_medium.render(label, True, TEXT_COLOR)
+            score_surface = self._text(self.font_medium, label, TEXT_COLOR)
             score_rect = score_surface.get_rect(center=(GAME_WIDTH // 2, y_offset))
             self.screen.blit(score_surface, score_rect)
             y_offset += 35
         
         # Instructions
-        instructions = self.font_small.render("Press ESC to exit", True, WAITING_TEXT_COLOR)
-        inst_rect = instructions.get_rect(center=(GAME_WIDTH // 2, GAME_HEIGHT - 50))
-        self.screen.blit(instructions, inst_rect)
+        self.screen.blit(*self._game_over_esc_text)
         
-        pygame.display.flip()
+        self._flip()
     
     def render_game(self, local_player_pos: Tuple[float, float], local_player_id: int,
                     local_player_color: str, local_player_score: int,
-                    remote_players: Dict[int, dict], coins: List[dict],
+                    remote_players: Dict[int, dict], coin_positions: List[Tuple[int, int]],
                     game_time: float = 0) -> None:
         """
         Render the main game state.
@@ -158,29 +245,23 @@ class GameRenderer:
             local_player_color: Color name of local player
             local_player_score: Score of local player
             remote_players: Dict of remote player data {id: {x, y, score, color}}
-            coins: List of coin data [{id, x, y}]
+            coin_positions: List of integer coin centers [(x, y)]
             game_time: Current game time in seconds
         """
         self.screen.fill(BACKGROUND_COLOR)
         
+        # Rects of everything that can move or change this frame
+        dirty: List[pygame.Rect] = []
+        
         # Draw game boundary
         pygame.draw.rect(self.screen, (60, 60, 70), (0, 0, GAME_WIDTH, GAME_HEIGHT), 3)
         
         # Draw coins
-        for coin in coins:
-            pygame.draw.circle(
-                self.screen,
-                COIN_COLOR,
-                (int(coin['x']), int(coin['y'])),
-                COIN_RADIUS
-            )
-            # Add a slight shine effect
-            pygame.draw.circle(
-                self.screen,
-                (255, 240, 150),
-                (int(coin['x'] - 3), int(coin['y'] - 3)),
-                COIN_RADIUS // 3
-            )
+        coin_sprite = self._coin_sprite
+        for coin_x, coin_y in coin_positions:
+            dirty.append(self.screen.blit(
+                coin_sprite, (coin_x - COIN_RADIUS, coin_y - COIN_RADIUS)
+            ))
         
         # Draw remote players
         for player_id, player_data in remote_players.items():
@@ -191,57 +272,66 @@ class GameRenderer:
             color = self.get_color(player_data.get('color', 'gray'))
             
             # Draw player circle
-            pygame.draw.circle(self.screen, color, (x, y), PLAYER_RADIUS)
-            pygame.draw.circle(self.screen, TEXT_COLOR, (x, y), PLAYER_RADIUS, 2)
+            sprite = self._player_sprite(color, TEXT_COLOR, 2)
+            dirty.append(self.screen.blit(sprite, (x - PLAYER_RADIUS, y - PLAYER_RADIUS)))
             
             # Draw player label
-            label = self.font_small.render(f"P{player_id}", True, TEXT_COLOR)
+            label = self._text(self.font_small, f"P{player_id}", TEXT_COLOR)
             label_rect = label.get_rect(center=(x, y - PLAYER_RADIUS - 15))
-            self.screen.blit(label, label_rect)
+            dirty.append(self.screen.blit(label, label_rect))
         
         # Draw local player (on top)
         local_x, local_y = int(local_player_pos[0]), int(local_player_pos[1])
         local_color = self.get_color(local_player_color)
         
         # Draw player circle with highlight to show it's the local player
-        pygame.draw.circle(self.screen, local_color, (local_x, local_y), PLAYER_RADIUS)
-        pygame.draw.circle(self.screen, (255, 255, 255), (local_x, local_y), PLAYER_RADIUS, 3)
+        sprite = self._player_sprite(local_color, (255, 255, 255), 3)
+        dirty.append(self.screen.blit(sprite, (local_x - PLAYER_RADIUS, local_y - PLAYER_RADIUS)))
         
         # Draw "YOU" label
-        you_label = self.font_small.render("YOU", True, TEXT_COLOR)
+        you_label = self._you_surface
         you_rect = you_label.get_rect(center=(local_x, local_y - PLAYER_RADIUS - 15))
-        self.screen.blit(you_label, you_rect)
+        dirty.append(self.screen.blit(you_label, you_rect))
         
         # Draw UI - Scores
-        self._render_scores(local_player_id, local_player_score, local_player_color, remote_players)
+        dirty.append(self._render_scores(local_player_id, local_player_score,
+                                         local_color, remote_players))
         
         # Draw timer if game has duration
         if GAME_DURATION:
             remaining = max(0, GAME_DURATION - game_time)
-            self._render_timer(remaining)
+            dirty.append(self._render_timer(remaining))
         
         # Draw controls hint
-        controls_text = self.font_small.render("WASD or Arrow Keys to move", True, WAITING_TEXT_COLOR)
-        controls_rect = controls_text.get_rect(center=(GAME_WIDTH // 2, GAME_HEIGHT - 20))
-        self.screen.blit(controls_text, controls_rect)
-        
-        pygame.display.flip()
+        self.screen.blit(*self._controls_text)
+        
+        # Present only regions that changed: this frame's dynamic elements
+        # plus where they were last frame. Static parts (background, border,
+        # controls hint) are redrawn identically, so they only need the full
+        # flip done when the game screen is first shown.
+        if self._last_dirty_rects is None:
+            pygame.display.flip()
+        else:
+            pygame.display.update(self._last_dirty_rects + dirty)
+        self._last_dirty_rects = dirty
     
     def _render_scores(self, local_player_id: int, local_player_score: int,
-                       local_player_color: str, remote_players: Dict[int, dict]) -> None:
-        """Render score display."""
+                       local_color: Tuple[int, int, int],
+                       remote_players: Dict[int, dict]) -> pygame.Rect:
+        """
+        Render score display. local_color is the already-resolved RGB color.
+        Returns the panel's screen area.
+        """
         # Background panel
         panel_rect = pygame.Rect(10, 10, 180, 80)
         pygame.draw.rect(self.screen, (20, 20, 30), panel_rect)
         pygame.draw.rect(self.screen, (60, 60, 70), panel_rect, 2)
         
         # Title
-        title = self.font_small.render("SCORES", True, TEXT_COLOR)
-        self.screen.blit(title, (20, 15))
+        self.screen.blit(*self._scores_title_text)
         
         # Local player score
-        local_color = self.get_color(local_player_color)
-        local_text = self.font_small.render(f"You (P{local_player_id}): {local_player_score}", True, local_color)
+        local_text = self._text(self.font_small, f"You (P{local_player_id}): {local_player_score}", local_color)
         self.screen.blit(local_text, (20, 40))
         
         # Remote player scores
@@ -250,18 +340,20 @@ class GameRenderer:
             if player_id == local_player_id:
                 continue
             color = self.get_color(player_data.get('color', 'gray'))
-            score_text = self.font_small.render(f"P{player_id}: {player_data.get('score', 0)}", True, color)
+            score_text = self._text(self.font_small, f"P{player_id}: {player_data.get('score', 0)}", color)
             self.screen.blit(score_text, (20, y_offset))
             y_offset += 20
+        
+        return panel_rect
     
-    def _render_timer(self, remaining_time: float) -> None:
-        """Render game timer."""
+    def _render_timer(self, remaining_time: float) -> pygame.Rect:
+        """Render game timer. Returns the timer's screen area."""
         minutes = int(remaining_time // 60)
         seconds = int(remaining_time % 60)
         time_str = f"{minutes}:{seconds:02d}"
         
         # Timer background
-        timer_surface = self.font_medium.render(time_str, True, TEXT_COLOR)
+        timer_surface = self._text(self.font_medium, time_str, TEXT_COLOR)
         timer_rect = timer_surface.get_rect(midtop=(GAME_WIDTH // 2, 10))
         
         # Background
@@ -271,6 +363,8 @@ class GameRenderer:
         
         # Timer text
         self.screen.blit(timer_surface, timer_rect)
+        
+        return bg_rect
     
     def tick(self, fps: int = 60) -> float:
         """
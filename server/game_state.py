@@ -4,7 +4,6 @@ Handles all game logic including player positions, coins, scores, and collisions
 This is the authoritative source of truth for the game.
 """
 
-import math
 import random
 import time
 from dataclasses import dataclass, field
@@ -16,11 +15,29 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 from shared.constants import (
     GAME_WIDTH, GAME_HEIGHT, PLAYER_RADIUS, PLAYER_SPEED,
     COIN_RADIUS, COIN_SPAWN_INTERVAL, MAX_COINS,
-    PLAYER_COLOR_NAMES, GameStates, GAME_DURATION, WINNING_SCORE
+    PLAYER_COLOR_NAMES, GameStates, MessageTypes, GAME_DURATION, WINNING_SCORE,
+    DIRECTION_VECTORS
 )
 
+# Player center bounds and coin spawn range, fixed for the whole game
+_PLAYER_MAX_X = GAME_WIDTH - PLAYER_RADIUS
+_PLAYER_MAX_Y = GAME_HEIGHT - PLAYER_RADIUS
+_COIN_MIN_POS = COIN_RADIUS + 10
+_COIN_MAX_X = GAME_WIDTH - COIN_RADIUS - 10
+_COIN_MAX_Y = GAME_HEIGHT - COIN_RADIUS - 10
 
-@dataclass
+# Cell size of the coin spatial hash. Any coin touching a player lies in the
+# player's cell or one of its 8 neighbours. Coins don't repel each other, so
+# a cell can hold up to MAX_COINS of them.
+GRID_CELL_SIZE = 2 * (PLAYER_RADIUS + COIN_RADIUS)
+
+
+def _grid_cell(x: float, y: float) -> Tuple[int, int]:
+    """Spatial hash cell containing the point (x, y)."""
+    return int(x // GRID_CELL_SIZE), int(y // GRID_CELL_SIZE)
+
+
+@dataclass(slots=True)
 class Player:
     """Represents a player in the game."""
     id: int
@@ -33,30 +50,42 @@ class Player:
     dy: int = 0  # -1 (up), 0 (none), 1 (down)
     
     def to_dict(self) -> dict:
-        """Convert player to dictionary for JSON serialization."""
+        """
+        Convert player to dictionary for JSON serialization.
+        Positions are quantized to whole pixels; clients render at pixel
+        granularity anyway.
+        """
         return {
             "id": self.id,
-            "x": round(self.x, 2),
-            "y": round(self.y, 2),
+            "x": round(self.x),
+            "y": round(self.y),
             "score": self.score,
             "color": self.color
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class Coin:
     """Represents a coin in the game."""
     id: int
     x: float
     y: float
+    # Coins never move, so the serialized form is built once
+    _dict: dict = field(init=False, repr=False, compare=False)
     
-    def to_dict(self) -> dict:
-        """Convert coin to dictionary for JSON serialization."""
-        return {
+    def __post_init__(self) -> None:
+        self._dict = {
             "id": self.id,
-            "x": round(self.x, 2),
-            "y": round(self.y, 2)
+            "x": round(self.x),  # Whole pixels: shorter on the wire
+            "y": round(self.y)
         }
+    
+    def to_dict(self) -> dict:
+        """
+        Convert coin to dictionary for JSON serialization.
+        Returns the same cached dict every time; callers must not modify it.
+        """
+        return self._dict
 
 
 class GameState:
@@ -68,7 +97,11 @@ class GameState:
     def __init__(self):
         self.players: Dict[int, Player] = {}
         self.coins: Dict[int, Coin] = {}
-        self.state: str = GameStates.WAITING
+        # Secondary index over self.coins: grid cell -> ids of coins in it
+        self._coin_grid: Dict[Tuple[int, int], List[int]] = {}
+        # Serialized coin list for snapshots; rebuilt only after coins change
+        self._coin_dicts: Optional[List[dict]] = None
+        self.state: GameStates = GameStates.WAITING
         self.next_coin_id: int = 1
         self.last_coin_spawn_time: float = 0
         self.game_start_time: Optional[float] = None
@@ -111,8 +144,9 @@ class GameState:
     def start_game(self) -> None:
         """Start the game."""
         self.state = GameStates.PLAYING
-        self.game_start_time = time.time()
-        self.last_coin_spawn_time = time.time()
+        now = time.monotonic()
+        self.game_start_time = now
+        self.last_coin_spawn_time = now
         # Spawn initial coins
         for _ in range(3):
             self.spawn_coin()
@@ -121,23 +155,27 @@ class GameState:
         """
         Update a player's input state.
         This is the only thing clients can control.
+        Non-numeric input is ignored; numbers are reduced to their sign.
         """
         if player_id in self.players:
+            if not isinstance(dx, (int, float)) or not isinstance(dy, (int, float)):
+                return
             player = self.players[player_id]
-            # Clamp values to valid range
-            player.dx = max(-1, min(1, dx))
-            player.dy = max(-1, min(1, dy))
+            # Reduce to -1, 0 or 1 so the value is always a DIRECTION_VECTORS key
+            player.dx = (dx > 0) - (dx < 0)
+            player.dy = (dy > 0) - (dy < 0)
     
-    def update(self, delta_time: float) -> List[dict]:
+    def update(self, delta_time: float, now: float) -> List[dict]:
         """
         Update the game state by one tick.
+        now is the tick's time.monotonic() timestamp.
         Returns a list of events that occurred (e.g., coin collected).
         """
         if self.state != GameStates.PLAYING:
             return []
         
         events = []
-        current_time = time.time()
+        current_time = now
         
         # Check for game over conditions
         if GAME_DURATION and self.game_start_time:
@@ -147,48 +185,66 @@ class GameState:
                 return events
         
         # Update player positions based on their input
+        step = PLAYER_SPEED * delta_time
+        lo = PLAYER_RADIUS
+        hi_x = _PLAYER_MAX_X
+        hi_y = _PLAYER_MAX_Y
         for player in self.players.values():
-            # Calculate movement
-            if player.dx != 0 or player.dy != 0:
+            # Read the input once; idle players are skipped entirely
+            dx = player.dx
+            dy = player.dy
+            if dx or dy:
                 # Normalize diagonal movement
-                magnitude = math.sqrt(player.dx ** 2 + player.dy ** 2)
-                normalized_dx = player.dx / magnitude
-                normalized_dy = player.dy / magnitude
+                normalized_dx, normalized_dy = DIRECTION_VECTORS[(dx, dy)]
                 
                 # Apply movement
-                new_x = player.x + normalized_dx * PLAYER_SPEED * delta_time
-                new_y = player.y + normalized_dy * PLAYER_SPEED * delta_time
+                new_x = player.x + normalized_dx * step
+                new_y = player.y + normalized_dy * step
                 
                 # Clamp to game boundaries
-                player.x = max(PLAYER_RADIUS, min(GAME_WIDTH - PLAYER_RADIUS, new_x))
-                player.y = max(PLAYER_RADIUS, min(GAME_HEIGHT - PLAYER_RADIUS, new_y))
+                player.x = lo if new_x < lo else (hi_x if new_x > hi_x else new_x)
+                player.y = lo if new_y < lo else (hi_y if new_y > hi_y else new_y)
         
         # Check for coin collisions
         # Use a set to track collected coins to prevent double collection
         coins_to_remove = set()
-        for coin_id, coin in self.coins.items():
-            if coin_id in coins_to_remove:
-                continue  # Skip already collected coins
-            for player in self.players.values():
-                if self._check_collision(player.x, player.y, PLAYER_RADIUS,
-                                        coin.x, coin.y, COIN_RADIUS):
-                    player.score += 1
-                    coins_to_remove.add(coin_id)
-                    events.append({
-                        "type": "coin_collected",
-                        "player_id": player.id,
-                        "coin_id": coin_id,
-                        "new_score": player.score
-                    })
-                    
-                    # Check for win by score
-                    if WINNING_SCORE and player.score >= WINNING_SCORE:
-                        self._end_game(player.id)
-                    break
+        # Each player only tests coins in the 3x3 grid cells around it,
+        # using squared distances (no sqrt). Players are visited in the same
+        # order as before, so on a tie the earlier player still gets the coin.
+        collect_dist_sq = (PLAYER_RADIUS + COIN_RADIUS) ** 2
+        coins = self.coins
+        coin_grid = self._coin_grid
+        for player in self.players.values():
+            player_x, player_y = player.x, player.y
+            cell_x, cell_y = _grid_cell(player_x, player_y)
+            for grid_x in (cell_x - 1, cell_x, cell_x + 1):
+                for grid_y in (cell_y - 1, cell_y, cell_y + 1):
+                    cell = coin_grid.get((grid_x, grid_y))
+                    if not cell:
+                        continue
+                    for coin_id in cell:
+                        if coin_id in coins_to_remove:
+                            continue  # Skip already collected coins
+                        coin = coins[coin_id]
+                        dx = player_x - coin.x
+                        dy = player_y - coin.y
+                        if dx * dx + dy * dy < collect_dist_sq:
+                            player.score += 1
+                            coins_to_remove.add(coin_id)
+                            events.append({
+                                "type": MessageTypes.COIN_COLLECTED,
+                                "player_id": player.id,
+                                "coin_id": coin_id,
+                                "new_score": player.score
+                            })
+                            
+                            # Check for win by score
+                            if WINNING_SCORE and player.score >= WINNING_SCORE:
+                                self._end_game(player.id)
         
         # Remove collected coins
         for coin_id in coins_to_remove:
-            del self.coins[coin_id]
+            self._remove_coin(coin_id)
         
         # Spawn new coins if needed
         if (current_time - self.last_coin_spawn_time >= COIN_SPAWN_INTERVAL and
@@ -219,56 +275,82 @@ class GameState:
         
         # Find a valid spawn position (not too close to players)
         max_attempts = 50
+        min_dist_sq = (PLAYER_RADIUS + COIN_RADIUS + 50) ** 2  # Give some buffer
+        uniform = random.uniform
+        lo, hi_x, hi_y = _COIN_MIN_POS, _COIN_MAX_X, _COIN_MAX_Y
+        # The exclusion discs cover under 10% of the board, so rejection
+        # sampling needs ~1.1 attempts on average; read player positions
+        # once rather than once per attempt
+        player_positions = [(player.x, player.y) for player in self.players.values()]
         for _ in range(max_attempts):
-            x = random.uniform(COIN_RADIUS + 10, GAME_WIDTH - COIN_RADIUS - 10)
-            y = random.uniform(COIN_RADIUS + 10, GAME_HEIGHT - COIN_RADIUS - 10)
+            x = uniform(lo, hi_x)
+            y = uniform(lo, hi_y)
             
             # Check distance from all players
-            valid = True
-            for player in self.players.values():
-                dist = math.sqrt((x - player.x) ** 2 + (y - player.y) ** 2)
-                if dist < PLAYER_RADIUS + COIN_RADIUS + 50:  # Give some buffer
-                    valid = False
+            for player_x, player_y in player_positions:
+                dx = x - player_x
+                dy = y - player_y
+                if dx * dx + dy * dy < min_dist_sq:
                     break
-            
-            if valid:
-                coin = Coin(id=self.next_coin_id, x=x, y=y)
-                self.coins[self.next_coin_id] = coin
-                self.next_coin_id += 1
-                return coin
+            else:
+                return self._add_coin(x, y)
         
         # If we couldn't find a valid position, spawn anyway
-        x = random.uniform(COIN_RADIUS + 10, GAME_WIDTH - COIN_RADIUS - 10)
-        y = random.uniform(COIN_RADIUS + 10, GAME_HEIGHT - COIN_RADIUS - 10)
+        x = uniform(lo, hi_x)
+        y = uniform(lo, hi_y)
+        return self._add_coin(x, y)
+    
+    def _add_coin(self, x: float, y: float) -> Coin:
+        """Create a coin at (x, y) and index it in the coin grid."""
         coin = Coin(id=self.next_coin_id, x=x, y=y)
-        self.coins[self.next_coin_id] = coin
+        self.coins[coin.id] = coin
+        self._coin_grid.setdefault(_grid_cell(x, y), []).append(coin.id)
+        self._coin_dicts = None
         self.next_coin_id += 1
         return coin
     
+    def _remove_coin(self, coin_id: int) -> None:
+        """Remove a coin and its coin grid entry."""
+        coin = self.coins.pop(coin_id)
+        cell_key = _grid_cell(coin.x, coin.y)
+        cell = self._coin_grid[cell_key]
+        cell.remove(coin_id)
+        if not cell:
+            del self._coin_grid[cell_key]
+        self._coin_dicts = None
+    
     def _check_collision(self, x1: float, y1: float, r1: float,
                          x2: float, y2: float, r2: float) -> bool:
-        """Check if two circles are colliding."""
-        distance = math.sqrt((x1 - x2) ** 2 + (y1 - y2) ** 2)
-        return distance < (r1 + r2)
+        """Check if two circles are colliding (compares squared distances)."""
+        dx = x1 - x2
+        dy = y1 - y2
+        r = r1 + r2
+        return dx * dx + dy * dy < r * r
     
-    def get_state_snapshot(self) -> dict:
+    def get_state_snapshot(self, now: float) -> dict:
         """
-        Get a complete snapshot of the current game state.
-        This is what gets broadcast to clients.
+        Get a complete snapshot of the current game state at time now
+        (time.monotonic()). This is what gets broadcast to clients.
         """
         return {
-            "type": "state",
-            "timestamp": time.time(),
+            "type": MessageTypes.STATE,
+            "timestamp": now,
             "game_state": self.state,
             "players": [p.to_dict() for p in self.players.values()],
-            "coins": [c.to_dict() for c in self.coins.values()],
-            "game_time": (time.time() - self.game_start_time) if self.game_start_time else 0,
+            "coins": self._get_coin_dicts(),
+            "game_time": (now - self.game_start_time) if self.game_start_time else 0,
             "winner": self.winner
         }
     
+    def _get_coin_dicts(self) -> List[dict]:
+        """Coin list for snapshots, reused until a coin spawns or is collected."""
+        if self._coin_dicts is None:
+            self._coin_dicts = [c.to_dict() for c in self.coins.values()]
+        return self._coin_dicts
+    
     def get_remaining_time(self) -> Optional[float]:
         """Get remaining game time in seconds."""
         if not GAME_DURATION or not self.game_start_time:
             return None
-        elapsed = time.time() - self.game_start_time
+        elapsed = time.monotonic() - self.game_start_time
         return max(0, GAME_DURATION - elapsed)
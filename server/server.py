@@ -4,14 +4,35 @@ Implements server-authoritative game logic with simulated network latency.
 """
 
 import asyncio
+import heapq
+import itertools
 import json
 import time
-from collections import deque
 from dataclasses import dataclass
-from typing import Dict, Optional, Set
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
 import websockets
 from websockets.server import WebSocketServerProtocol
 
+# Optional faster JSON codec; falls back to the standard library.
+# orjson.JSONDecodeError subclasses json.JSONDecodeError, so error
+# handling is the same for both. OPT_NON_STR_KEYS matches json.dumps for
+# the int-keyed final_scores dict.
+# Outgoing messages are encoded to UTF-8 JSON bytes once and sent as-is
+# (binary frames), so websockets doesn't re-encode them for every client.
+# The client's JSON decoder accepts bytes and str alike.
+try:
+    import orjson
+    _loads = orjson.loads
+    
+    def _dumps(obj: Any) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+except ImportError:
+    orjson = None
+    _loads = json.loads
+    
+    def _dumps(obj: Any) -> bytes:
+        return json.dumps(obj).encode()
+
 import sys
 import os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
@@ -21,11 +42,16 @@ from shared.constants import (
 )
 from game_state import GameState
 
+# Longest a broadcast send may block the game loop. A client that stays
+# connected but stops reading fills its write buffer and send() blocks on
+# drain; past this deadline the client is dropped.
+SEND_TIMEOUT = 0.1
+
 
 @dataclass
 class DelayedMessage:
     """A message that will be processed after a delay."""
-    process_time: float
+    process_time_ns: int  # time.monotonic_ns() deadline
     message: dict
     player_id: int
 
@@ -34,57 +60,90 @@ class DelayedMessageQueue:
     """
     Queue for simulating network latency.
     Messages are held for NETWORK_DELAY_MS before being processed.
+    Kept as a heap of (process_time_ns, seq, message) so delivery order holds
+    even if per-message delays differ; seq breaks ties in arrival order.
+    Times are integer time.monotonic_ns() values.
     """
     
     def __init__(self, delay_ms: int = NETWORK_DELAY_MS):
-        self.delay = delay_ms / 1000.0
-        self.queue: deque = deque()
+        self.delay_ns = delay_ms * 1_000_000
+        self.queue: List[Tuple[int, int, DelayedMessage]] = []
+        self._seq = itertools.count()
     
     def add_message(self, message: dict, player_id: int) -> None:
         """Add a message to the delay queue."""
-        process_time = time.time() + self.delay
-        self.queue.append(DelayedMessage(process_time, message, player_id))
+        process_time_ns = time.monotonic_ns() + self.delay_ns
+        heapq.heappush(self.queue, (process_time_ns, next(self._seq),
+                                    DelayedMessage(process_time_ns, message, player_id)))
     
-    def get_ready_messages(self) -> list:
-        """Get all messages that are ready to be processed."""
-        ready = []
-        current_time = time.time()
-        while self.queue and self.queue[0].process_time <= current_time:
-            ready.append(self.queue.popleft())
-        return ready
+    def get_ready_messages(self, now_ns: int) -> Iterator[DelayedMessage]:
+        """Yield all messages that are ready to be processed at now_ns."""
+        queue = self.queue
+        while queue and queue[0][0] <= now_ns:
+            yield heapq.heappop(queue)[2]
+    
+    def next_due_ns(self) -> Optional[int]:
+        """Processing time of the earliest queued message, if any."""
+        return self.queue[0][0] if self.queue else None
 
 
 @dataclass
 class DelayedBroadcast:
     """A broadcast message that will be sent after a delay."""
-    send_time: float
-    message: str
+    send_time_ns: int  # time.monotonic_ns() deadline
+    message: bytes  # Serialized JSON
     exclude_player_id: Optional[int] = None
+    is_state: bool = False  # Full state snapshot; superseded by any newer one
 
 
 class DelayedBroadcastQueue:
     """
     Queue for simulating network latency on outgoing broadcasts.
     Messages are held for NETWORK_DELAY_MS before being sent to clients.
+    Kept as a heap of (send_time_ns, seq, broadcast), like DelayedMessageQueue.
+    When several state snapshots are due at once (the loop stalled), only
+    the newest is sent; other broadcasts are always delivered.
     """
     
     def __init__(self, delay_ms: int = NETWORK_DELAY_MS):
-        self.delay = delay_ms / 1000.0
-        self.queue: deque = deque()
+        self.delay_ns = delay_ms * 1_000_000
+        self.queue: List[Tuple[int, int, DelayedBroadcast]] = []
+        self._seq = itertools.count()
     
-    def add_broadcast(self, message: dict, exclude: Optional[int] = None) -> None:
+    def add_broadcast(self, message: dict, exclude: Optional[int] = None,
+                      is_state: bool = False) -> None:
         """Add a broadcast message to the delay queue."""
-        send_time = time.time() + self.delay
-        message_str = json.dumps(message)
-        self.queue.append(DelayedBroadcast(send_time, message_str, exclude))
+        send_time_ns = time.monotonic_ns() + self.delay_ns
+        message_bytes = _dumps(message)
+        heapq.heappush(self.queue, (send_time_ns, next(self._seq),
+                                    DelayedBroadcast(send_time_ns, message_bytes, exclude, is_state)))
     
-    def get_ready_broadcasts(self) -> list:
-        """Get all broadcasts that are ready to be sent."""
+    def get_ready_broadcasts(self, now_ns: int) -> Iterator[DelayedBroadcast]:
+        """Yield all broadcasts that are ready to be sent at now_ns."""
+        queue = self.queue
+        if not queue or queue[0][0] > now_ns:
+            return
+        
         ready = []
-        current_time = time.time()
-        while self.queue and self.queue[0].send_time <= current_time:
-            ready.append(self.queue.popleft())
-        return ready
+        while queue and queue[0][0] <= now_ns:
+            ready.append(heapq.heappop(queue)[2])
+        
+        # Snapshots still in flight are left alone - each one is due 1/rate
+        # after the previous. Only coalesce those that are already late.
+        newest_state = None
+        for broadcast in reversed(ready):
+            if broadcast.is_state:
+                newest_state = broadcast
+                break
+        
+        for broadcast in ready:
+            if broadcast.is_state and broadcast is not newest_state:
+                continue  # Stale snapshot
+            yield broadcast
+    
+    def next_due_ns(self) -> Optional[int]:
+        """Send time of the earliest queued broadcast, if any."""
+        return self.queue[0][0] if self.queue else None
 
 
 class GameServer:
@@ -95,34 +154,45 @@ class GameServer:
     def __init__(self):
         self.game_state = GameState()
         self.clients: Dict[int, WebSocketServerProtocol] = {}
-        self.available_player_ids = [1, 2]  # Pool of available player IDs
+        # Pool of available player IDs as a bitmask: bit (id - 1) is set
+        # while that ID is free. IDs 1 and 2 start free.
+        self._free_player_ids = 0b11
         self.input_queue = DelayedMessageQueue()
         self.broadcast_queue = DelayedBroadcastQueue()  # New: delayed broadcast queue
         self.running = False
-        self.last_update_time = time.time()
-        self.last_broadcast_time = time.time()
-        self.broadcast_interval = 1.0 / STATE_BROADCAST_RATE
+        # Scheduling uses integer time.monotonic_ns(), immune to wall-clock
+        # jumps; game state and message timestamps get it as float seconds
+        self.last_update_ns = time.monotonic_ns()
+        self.last_broadcast_ns = self.last_update_ns
+        self.broadcast_interval_ns = 1_000_000_000 // STATE_BROADCAST_RATE
+        # Set when something may need the game loop while no game is running
+        # (connect, disconnect, input); the loop sleeps on it instead of ticking
+        self._wake_event = asyncio.Event()
         
     async def register_client(self, websocket: WebSocketServerProtocol) -> Optional[int]:
         """
         Register a new client connection.
         Returns the assigned player ID, or None if game is full.
         """
-        if len(self.clients) >= 2 or not self.available_player_ids:
-            await websocket.send(json.dumps({
-                "type": "error",
+        if len(self.clients) >= 2 or not self._free_player_ids:
+            await websocket.send(_dumps({
+                "type": MessageTypes.ERROR,
                 "message": "Game is full. Only 2 players allowed."
             }))
             return None
         
-        # Get an available player ID from the pool
-        player_id = self.available_player_ids.pop(0)
+        # Take the lowest free player ID: isolate the lowest set bit
+        free = self._free_player_ids
+        lowest = free & -free
+        self._free_player_ids = free ^ lowest
+        player_id = lowest.bit_length()
         
         self.clients[player_id] = websocket
         player = self.game_state.add_player(player_id)
+        self._wake_event.set()
         
         # Send player assignment
-        await websocket.send(json.dumps({
+        await websocket.send(_dumps({
             "type": MessageTypes.ASSIGN,
             "player_id": player_id,
             "color": player.color,
@@ -137,22 +207,26 @@ class GameServer:
             await self.start_game()
         else:
             # Notify client they're waiting
-            await websocket.send(json.dumps({
-                "type": "waiting",
+            await websocket.send(_dumps({
+                "type": MessageTypes.WAITING,
                 "message": "Waiting for another player to join..."
             }))
         
         return player_id
     
-    async def unregister_client(self, player_id: int) -> None:
-        """Handle client disconnection."""
-        if player_id in self.clients:
+    async def unregister_client(self, player_id: int,
+                                websocket: WebSocketServerProtocol) -> None:
+        """
+        Handle client disconnection.
+        Only acts if player_id still belongs to websocket, so a repeated or
+        late call can't remove a new client that has since taken the ID.
+        """
+        if self.clients.get(player_id) is websocket:
             del self.clients[player_id]
             self.game_state.remove_player(player_id)
-            # Return the player ID to the available pool
-            if player_id not in self.available_player_ids:
-                self.available_player_ids.append(player_id)
-                self.available_player_ids.sort()  # Keep IDs in order
+            self._wake_event.set()
+            # Return the player ID to the available pool (idempotent)
+            self._free_player_ids |= 1 << (player_id - 1)
             print(f"Player {player_id} disconnected. Total players: {len(self.clients)}")
             
             # Notify other players (queue for delayed send)
@@ -169,35 +243,51 @@ class GameServer:
         # Queue game start broadcast with delay
         self.broadcast_queue.add_broadcast({
             "type": MessageTypes.GAME_START,
-            "timestamp": time.time()
+            "timestamp": time.monotonic()
         })
     
     def queue_broadcast(self, message: dict, exclude: Optional[int] = None) -> None:
         """Queue a message for delayed broadcast to all clients."""
         self.broadcast_queue.add_broadcast(message, exclude)
     
-    async def send_delayed_broadcasts(self) -> None:
+    async def send_delayed_broadcasts(self, now_ns: int) -> None:
         """Send all broadcasts that have passed their delay time."""
-        ready_broadcasts = self.broadcast_queue.get_ready_broadcasts()
-        for broadcast in ready_broadcasts:
+        for broadcast in self.broadcast_queue.get_ready_broadcasts(now_ns):
             await self._send_to_clients(broadcast.message, broadcast.exclude_player_id)
     
-    async def _send_to_clients(self, message_str: str, exclude: Optional[int] = None) -> None:
+    async def _send_to_clients(self, message: bytes, exclude: Optional[int] = None) -> None:
         """Actually send a message to all connected clients."""
         if not self.clients:
             return
         
-        tasks = []
-        for player_id, websocket in list(self.clients.items()):
-            if exclude and player_id == exclude:
-                continue
-            try:
-                tasks.append(websocket.send(message_str))
-            except websockets.exceptions.ConnectionClosed:
-                pass
+        # Recipients are read straight from self.clients (nothing can mutate
+        # it before the first await). This single list is kept only to map
+        # send results back to player ids, since unregistering below - or in
+        # handle_client during the gather - mutates self.clients.
+        targets = [(player_id, websocket) for player_id, websocket in self.clients.items()
+                   if player_id != exclude]
+        if not targets:
+            return
         
-        if tasks:
-            await asyncio.gather(*tasks, return_exceptions=True)
+        results = await asyncio.gather(
+            *(asyncio.wait_for(websocket.send(message), SEND_TIMEOUT)
+              for _, websocket in targets),
+            return_exceptions=True
+        )
+        
+        # Reap clients whose connection closed or who stopped reading now
+        # rather than waiting for handle_client (or the ping timeout) to
+        # notice; unregister_client ignores repeats
+        for (player_id, websocket), result in zip(targets, results):
+            if isinstance(result, asyncio.TimeoutError):
+                print(f"Player {player_id} is not reading; dropping connection")
+                # The timed-out send may have left a partial frame behind, so
+                # abort the transport rather than attempt a close handshake.
+                # handle_client then sees ConnectionClosed and exits.
+                websocket.transport.abort()
+                await self.unregister_client(player_id, websocket)
+            elif isinstance(result, websockets.exceptions.ConnectionClosed):
+                await self.unregister_client(player_id, websocket)
     
     async def broadcast(self, message: dict, exclude: Optional[int] = None) -> None:
         """
@@ -206,19 +296,19 @@ class GameServer:
         """
         self.broadcast_queue.add_broadcast(message, exclude)
     
-    async def broadcast_state(self) -> None:
+    async def broadcast_state(self, now: float) -> None:
         """Queue the current game state for delayed broadcast to all clients."""
-        state = self.game_state.get_state_snapshot()
-        self.broadcast_queue.add_broadcast(state)
+        state = self.game_state.get_state_snapshot(now)
+        self.broadcast_queue.add_broadcast(state, is_state=True)
     
     def process_input(self, player_id: int, message: dict) -> None:
         """Queue an input message for delayed processing."""
         self.input_queue.add_message(message, player_id)
+        self._wake_event.set()
     
-    def process_delayed_inputs(self) -> None:
+    def process_delayed_inputs(self, now_ns: int) -> None:
         """Process all inputs that have passed their delay time."""
-        ready_messages = self.input_queue.get_ready_messages()
-        for delayed_msg in ready_messages:
+        for delayed_msg in self.input_queue.get_ready_messages(now_ns):
             if delayed_msg.message.get("type") == MessageTypes.INPUT:
                 dx = delayed_msg.message.get("dx", 0)
                 dy = delayed_msg.message.get("dy", 0)
@@ -233,7 +323,7 @@ class GameServer:
         try:
             async for message in websocket:
                 try:
-                    data = json.loads(message)
+                    data = _loads(message)
                     # Queue the input for delayed processing
                     self.process_input(player_id, data)
                 except json.JSONDecodeError:
@@ -241,7 +331,7 @@ class GameServer:
         except websockets.exceptions.ConnectionClosed:
             pass
         finally:
-            await self.unregister_client(player_id)
+            await self.unregister_client(player_id, websocket)
     
     async def game_loop(self) -> None:
         """Main game loop - updates game state and broadcasts to clients."""
@@ -249,49 +339,82 @@ class GameServer:
         target_tick_rate = 60  # 60 ticks per second
         tick_interval = 1.0 / target_tick_rate
         
+        # Hot-path lookups bound once. game_state and clients are never
+        # rebound (clients is only mutated in place), so these stay valid
+        # across awaits.
+        game_state = self.game_state
+        clients = self.clients
+        monotonic_ns = time.monotonic_ns
+        process_delayed_inputs = self.process_delayed_inputs
+        send_delayed_broadcasts = self.send_delayed_broadcasts
+        queue_broadcast = self.queue_broadcast
+        PLAYING = GameStates.PLAYING
+        ENDED = GameStates.ENDED
+        
         while self.running:
-            loop_start = time.time()
+            # One clock read per tick, shared by every step below
+            now_ns = monotonic_ns()
+            current_time = now_ns / 1e9
             
             # Calculate delta time
-            current_time = time.time()
-            delta_time = current_time - self.last_update_time
-            self.last_update_time = current_time
+            delta_time = (now_ns - self.last_update_ns) / 1e9
+            self.last_update_ns = now_ns
             
             # Process delayed inputs
-            self.process_delayed_inputs()
+            process_delayed_inputs(now_ns)
             
             # Send any delayed broadcasts that are ready
-            await self.send_delayed_broadcasts()
+            await send_delayed_broadcasts(now_ns)
             
             # Only process game logic if we have clients and game is playing
-            if self.clients and self.game_state.state == GameStates.PLAYING:
-                events = self.game_state.update(delta_time)
+            if clients and game_state.state == PLAYING:
+                events = game_state.update(delta_time, current_time)
                 
                 # Queue any events for broadcast (coin collected, etc.)
                 for event in events:
-                    self.queue_broadcast(event)
+                    queue_broadcast(event)
                 
                 # Check if game ended
-                if self.game_state.state == GameStates.ENDED:
-                    self.queue_broadcast({
+                if game_state.state == ENDED:
+                    queue_broadcast({
                         "type": MessageTypes.GAME_OVER,
-                        "winner": self.game_state.winner,
+                        "winner": game_state.winner,
                         "final_scores": {
-                            p.id: p.score for p in self.game_state.players.values()
+                            p.id: p.score for p in game_state.players.values()
                         }
                     })
             
             # Broadcast state at the configured rate (only if game is playing)
-            if (self.clients and 
-                self.game_state.state == GameStates.PLAYING and
-                current_time - self.last_broadcast_time >= self.broadcast_interval):
-                await self.broadcast_state()
-                self.last_broadcast_time = current_time
+            playing = game_state.state == PLAYING
+            if (clients and playing and
+                now_ns - self.last_broadcast_ns >= self.broadcast_interval_ns):
+                await self.broadcast_state(current_time)
+                self.last_broadcast_ns = now_ns
             
-            # Sleep to maintain tick rate
-            elapsed = time.time() - loop_start
-            sleep_time = max(0, tick_interval - elapsed)
-            await asyncio.sleep(sleep_time)
+            # Sleep to maintain tick rate while playing; otherwise (including
+            # a game whose clients all left) sleep until there's something to do
+            if playing and clients:
+                elapsed = (monotonic_ns() - now_ns) / 1e9
+                sleep_time = max(0, tick_interval - elapsed)
+                await asyncio.sleep(sleep_time)
+            else:
+                await self._wait_for_work()
+    
+    async def _wait_for_work(self) -> None:
+        """
+        Block the idle game loop until it is woken or the next delayed
+        input/broadcast is due.
+        """
+        self._wake_event.clear()
+        due_times = [t for t in (self.input_queue.next_due_ns(),
+                                 self.broadcast_queue.next_due_ns()) if t is not None]
+        timeout = max(0.0, (min(due_times) - time.monotonic_ns()) / 1e9) if due_times else None
+        try:
+            await asyncio.wait_for(self._wake_event.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        # Idle time is not simulated time
+        self.last_update_ns = time.monotonic_ns()
     
     async def start(self) -> None:
         """Start the game server."""
@@ -0,0 +1,3 @@
+"""
+Shared modules used by both the Coin Collector server and client.
+"""
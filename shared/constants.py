@@ -3,6 +3,8 @@ Shared constants for the Coin Collector multiplayer game.
 These constants are used by both server and client.
 """
 
+from enum import IntEnum
+
 # Game area dimensions
 GAME_WIDTH = 800
 GAME_HEIGHT = 600
@@ -11,6 +13,15 @@ GAME_HEIGHT = 600
 PLAYER_RADIUS = 15  # Circle radius in pixels
 PLAYER_SPEED = 200  # Pixels per second
 
+# Unit movement vector for every (dx, dy) input with dx, dy in {-1, 0, 1};
+# diagonals are pre-normalized so movement never needs a sqrt
+_DIAGONAL = 0.7071067811865475  # 1 / sqrt(2)
+DIRECTION_VECTORS = {
+    (dx, dy): (dx * (_DIAGONAL if dx and dy else 1.0),
+               dy * (_DIAGONAL if dx and dy else 1.0))
+    for dx in (-1, 0, 1) for dy in (-1, 0, 1)
+}
+
 # Coin configuration
 COIN_RADIUS = 10  # Circle radius in pixels
 COIN_SPAWN_INTERVAL = 3.0  # Seconds between coin spawns
@@ -26,6 +37,7 @@ INPUT_SEND_RATE = 20  # Client input sends per second
 # Interpolation configuration
 INTERPOLATION_DELAY = 0.1  # Render 100ms behind latest data for smooth interpolation
 POSITION_BUFFER_SIZE = 20  # Number of position snapshots to keep
+SERVER_TIME_SMOOTHING = 0.1  # EMA weight of each new server clock offset sample
 
 # Player colors (RGB tuples)
 PLAYER_COLORS = {
@@ -46,24 +58,29 @@ BACKGROUND_COLOR = (30, 30, 40)  # Dark gray
 TEXT_COLOR = (255, 255, 255)  # White
 WAITING_TEXT_COLOR = (200, 200, 200)  # Light gray
 
+# Game states and message types are IntEnums: they go over the wire as
+# small ints and compare equal to the ints decoded on the other side.
+
 # Game states
-class GameStates:
-    WAITING = "waiting"
-    PLAYING = "playing"
-    ENDED = "ended"
+class GameStates(IntEnum):
+    WAITING = 0
+    PLAYING = 1
+    ENDED = 2
 
 # Message types
-class MessageTypes:
+class MessageTypes(IntEnum):
     # Client -> Server
-    INPUT = "input"
+    INPUT = 0
     
     # Server -> Client
-    STATE = "state"
-    ASSIGN = "assign"
-    GAME_START = "game_start"
-    COIN_COLLECTED = "coin_collected"
-    PLAYER_DISCONNECTED = "player_disconnected"
-    GAME_OVER = "game_over"
+    STATE = 1
+    ASSIGN = 2
+    GAME_START = 3
+    COIN_COLLECTED = 4
+    PLAYER_DISCONNECTED = 5
+    GAME_OVER = 6
+    WAITING = 7
+    ERROR = 8
 
 # Game rules
 GAME_DURATION = 60  # Game duration in seconds (None for unlimited)